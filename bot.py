@@ -1,40 +1,68 @@
 import os
 import asyncio
+import atexit
 import logging
-import signal
+import queue
+import re
 import sys
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
 from datetime import datetime
+from functools import lru_cache, wraps
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, List, Optional
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackQueryHandler
-from telegram import Update, BotCommand
+from telegram import Update, BotCommand, BotCommandScopeChat
 from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
-from telegram.error import TelegramError
+from telegram.error import TelegramError, RetryAfter, TimedOut
 from telegram.constants import ParseMode
 import asyncpg
-from aiohttp import web
 
-# Configure logging for Render
+# Use uvloop's libuv event loop when available; everything here is awaited
+# I/O, so the cheaper loop benefits every handler and fan-out
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Configure logging for Render. Records go through a QueueHandler to a
+# listener thread, so stdout writes (and burst traceback formatting in
+# error storms) happen off the event loop
+_log_queue = queue.Queue(-1)
+_log_output = logging.StreamHandler(sys.stdout)  # Important for Render logs
+_log_output.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+# The queue side only merges args/exceptions into the message; the full
+# line format is applied once, by the listener's handler
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO,
-    handlers=[
-        logging.StreamHandler(sys.stdout)  # Important for Render logs
-    ]
+    handlers=[_queue_handler]
 )
+_log_listener = QueueListener(_log_queue, _log_output, respect_handler_level=True)
+_log_listener.start()
+# The listener thread is a daemon; without this, records still queued at
+# interpreter exit (e.g. the missing-token early return) are lost
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Read once at import; env vars don't change while the process runs
+BOT_VERSION = os.getenv('BOT_VERSION', '2.0.0')
+
+# Optional chat (channel/group the bot can post in) used to store the test
+# message once per text; checks then copy it instead of re-sending
+# parse-mode text to every channel
+STORAGE_CHAT_ID = os.getenv('STORAGE_CHAT_ID')
+
 # Database connection pool
 db_pool = None
 is_shutting_down = False
 
-# Graceful shutdown handler
-async def shutdown_handler():
-    """Handle graceful shutdown"""
-    global is_shutting_down
-    is_shutting_down = True
-    logger.info("🚨 Shutdown initiated...")
-
 async def init_db():
     """Initialize database connection pool with Render optimizations"""
     global db_pool
@@ -51,10 +79,12 @@ async def init_db():
         # Optimized for Render's free tier
         db_pool = await asyncpg.create_pool(
             database_url,
-            min_size=1,  # Reduced for free tier
-            max_size=5,  # Reduced for free tier
+            min_size=int(os.getenv('DB_POOL_MIN', '5')),   # Opened eagerly at startup
+            max_size=int(os.getenv('DB_POOL_MAX', '20')),
             command_timeout=30,
             timeout=10,
+            statement_cache_size=1024,  # Keep hot statements prepared per connection
+            max_inactive_connection_lifetime=600,  # Recycle idle conns Render may drop
             server_settings={
                 'statement_timeout': '30000',
                 'idle_in_transaction_session_timeout': '10000'
@@ -68,43 +98,44 @@ async def init_db():
         
         # Create tables if they don't exist
         async with db_pool.acquire() as conn:
-            # Config table
+            # All DDL in one round-trip (multi-statement scripts are fine
+            # for parameterless execute)
             await conn.execute('''
                 CREATE TABLE IF NOT EXISTS config (
                     key TEXT PRIMARY KEY,
                     value TEXT NOT NULL
-                )
-            ''')
-            
-            # Admins table
-            await conn.execute('''
+                );
+
                 CREATE TABLE IF NOT EXISTS admins (
                     user_id BIGINT PRIMARY KEY,
                     added_at TIMESTAMP DEFAULT NOW()
-                )
-            ''')
-            
-            # Channels table
-            await conn.execute('''
+                );
+
                 CREATE TABLE IF NOT EXISTS channels (
                     channel_id TEXT PRIMARY KEY,
                     channel_name TEXT NOT NULL,
                     added_at TIMESTAMP DEFAULT NOW(),
                     last_check TIMESTAMP,
                     status TEXT DEFAULT 'unknown'
-                )
-            ''')
-            
-            # Channel groups table
-            await conn.execute('''
+                );
+
                 CREATE TABLE IF NOT EXISTS channel_groups (
                     group_name TEXT NOT NULL,
                     channel_id TEXT NOT NULL,
                     added_at TIMESTAMP DEFAULT NOW(),
                     PRIMARY KEY (group_name, channel_id)
-                )
+                );
+
+                CREATE TABLE IF NOT EXISTS broadcast_queue (
+                    broadcast_id TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    from_chat_id BIGINT NOT NULL,
+                    message_id BIGINT NOT NULL,
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    PRIMARY KEY (broadcast_id, channel_id)
+                );
             ''')
-            
+
             # Set default config
             defaults = [
                 ('owner', '0'),
@@ -114,15 +145,17 @@ async def init_db():
                 ('bot_active', 'true'),
                 ('broadcast_delay', '0.5')
             ]
-            
-            for key, value in defaults:
-                await conn.execute('''
-                    INSERT INTO config (key, value) VALUES ($1, $2)
-                    ON CONFLICT (key) DO NOTHING
-                ''', key, value)
-            
+
+            await conn.executemany('''
+                INSERT INTO config (key, value) VALUES ($1, $2)
+                ON CONFLICT (key) DO NOTHING
+            ''', defaults)
+
             logger.info("✅ Database tables initialized")
-        
+
+        await load_admin_cache()
+        await load_channel_cache()
+
         return True
         
     except Exception as e:
@@ -133,57 +166,117 @@ async def init_db():
         logger.error("3. Database credentials are valid")
         return False
 
+# Config rows change rarely but are read on nearly every handler; serve
+# reads from a short-TTL write-through cache to avoid a Postgres
+# round-trip per key
+_config_cache: Dict[str, tuple] = {}
+_CONFIG_CACHE_TTL = 30.0
+
 async def get_config(key: str) -> Optional[str]:
-    """Get config value from database"""
+    """Get config value from database (cached for a short TTL)"""
     if not db_pool or is_shutting_down:
         return None
-    
+
+    cached = _config_cache.get(key)
+    if cached and time.monotonic() - cached[1] < _CONFIG_CACHE_TTL:
+        return cached[0]
+
     try:
         async with db_pool.acquire() as conn:
             result = await conn.fetchval('SELECT value FROM config WHERE key = $1', key)
-            return result
+        _config_cache[key] = (result, time.monotonic())
+        return result
     except Exception as e:
         logger.error(f"Error getting config {key}: {e}")
         return None
 
+async def get_many_configs(keys: List[str], conn=None) -> Dict[str, str]:
+    """Get several config values in a single query"""
+    if not db_pool or is_shutting_down:
+        return {}
+
+    try:
+        if conn is not None:
+            rows = await conn.fetch(
+                'SELECT key, value FROM config WHERE key = ANY($1::text[])', keys
+            )
+        else:
+            async with db_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT key, value FROM config WHERE key = ANY($1::text[])', keys
+                )
+        now = time.monotonic()
+        for row in rows:
+            _config_cache[row[0]] = (row[1], now)
+        return {row[0]: row[1] for row in rows}
+    except Exception as e:
+        logger.error(f"Error getting configs {keys}: {e}")
+        return {}
+
 async def set_config(key: str, value: str):
     """Set config value in database"""
     if not db_pool or is_shutting_down:
         return
-    
+
     try:
         async with db_pool.acquire() as conn:
             await conn.execute('''
                 INSERT INTO config (key, value) VALUES ($1, $2)
                 ON CONFLICT (key) DO UPDATE SET value = $2
             ''', key, value)
+        _config_cache[key] = (value, time.monotonic())
     except Exception as e:
         logger.error(f"Error setting config {key}: {e}")
 
+# Write-through mirror of the owner id and admins table; loaded once at
+# startup so is_admin (called on nearly every command) never round-trips
+# to Postgres
+_owner_cache: Optional[int] = None
+_admins_cache: Optional[set] = None
+
+async def load_admin_cache():
+    """Load the owner id and admin set into the in-memory mirror"""
+    global _owner_cache, _admins_cache
+    try:
+        async with db_pool.acquire() as conn:
+            owner_val = await conn.fetchval("SELECT value FROM config WHERE key = 'owner'")
+            rows = await conn.fetch('SELECT user_id FROM admins')
+        _owner_cache = int(owner_val) if owner_val else 0
+        _admins_cache = {row['user_id'] for row in rows}
+        logger.info(f"✅ Admin cache loaded ({len(_admins_cache)} admins)")
+    except Exception as e:
+        logger.error(f"Error loading admin cache: {e}")
+
 async def get_owner() -> int:
     """Get owner ID"""
+    if _owner_cache is not None:
+        return _owner_cache
     val = await get_config('owner')
     return int(val) if val else 0
 
 async def set_owner(user_id: int):
     """Set owner ID"""
+    global _owner_cache
     await set_config('owner', str(user_id))
+    _owner_cache = user_id
 
 async def is_admin(user_id: int) -> bool:
     """Check if user is admin or owner"""
     if is_shutting_down:
         return False
-    
-    owner = await get_owner()
-    if user_id == owner:
-        return True
-    
+
+    if _owner_cache is not None and _admins_cache is not None:
+        return user_id == _owner_cache or user_id in _admins_cache
+
+    # Mirror not loaded; answer owner + membership in one round-trip
+    # instead of a config lookup followed by an admins probe
     try:
         async with db_pool.acquire() as conn:
-            result = await conn.fetchval(
-                'SELECT user_id FROM admins WHERE user_id = $1', user_id
-            )
-            return result is not None
+            result = await conn.fetchval('''
+                SELECT EXISTS (SELECT 1 FROM admins WHERE user_id = $1)
+                    OR COALESCE((SELECT value FROM config WHERE key = 'owner'), '0') = $2
+            ''', user_id, str(user_id))
+            return bool(result)
     except Exception:
         return False
 
@@ -191,13 +284,15 @@ async def add_admin(user_id: int):
     """Add admin to database"""
     if is_shutting_down:
         return
-    
+
     try:
         async with db_pool.acquire() as conn:
             await conn.execute(
                 'INSERT INTO admins (user_id) VALUES ($1) ON CONFLICT DO NOTHING',
                 user_id
             )
+        if _admins_cache is not None:
+            _admins_cache.add(user_id)
     except Exception as e:
         logger.error(f"Error adding admin {user_id}: {e}")
 
@@ -205,22 +300,28 @@ async def remove_admin(user_id: int):
     """Remove admin from database"""
     if is_shutting_down:
         return
-    
+
     try:
         async with db_pool.acquire() as conn:
             await conn.execute('DELETE FROM admins WHERE user_id = $1', user_id)
+        if _admins_cache is not None:
+            _admins_cache.discard(user_id)
     except Exception as e:
         logger.error(f"Error removing admin {user_id}: {e}")
 
-async def get_admins_count() -> int:
+async def get_admins_count(conn=None) -> int:
     """Get number of admins"""
     if not db_pool or is_shutting_down:
         return 0
-    
+
+    if _admins_cache is not None:
+        return len(_admins_cache)
+
     try:
+        if conn is not None:
+            return (await conn.fetchval('SELECT COUNT(*) FROM admins')) or 0
         async with db_pool.acquire() as conn:
-            count = await conn.fetchval('SELECT COUNT(*) FROM admins')
-            return count or 0
+            return (await conn.fetchval('SELECT COUNT(*) FROM admins')) or 0
     except Exception:
         return 0
 
@@ -228,19 +329,39 @@ async def get_all_admins() -> List[int]:
     """Get all admin IDs"""
     if not db_pool or is_shutting_down:
         return []
-    
+
+    if _admins_cache is not None:
+        # Snapshot so callers that iterate across awaits (the alert
+        # fan-out) aren't affected by a concurrent add/remove
+        return list(_admins_cache)
+
     try:
         async with db_pool.acquire() as conn:
             rows = await conn.fetch('SELECT user_id FROM admins')
-            return [row['user_id'] for row in rows]
+            return [row[0] for row in rows]
     except Exception:
         return []
 
+# Write-through mirror of the channels table; channels only change via bot
+# commands, so after the startup load every read is an in-memory dict hit
+_channels_cache: Optional[Dict[str, str]] = None
+
+async def load_channel_cache():
+    """Load the channels table into the in-memory mirror"""
+    global _channels_cache
+    try:
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch('SELECT channel_id, channel_name FROM channels')
+        _channels_cache = dict(rows)
+        logger.info(f"✅ Channel cache loaded ({len(_channels_cache)} channels)")
+    except Exception as e:
+        logger.error(f"Error loading channel cache: {e}")
+
 async def add_channel(channel_id: str, channel_name: str):
     """Add channel to database"""
     if is_shutting_down:
         return
-    
+
     try:
         async with db_pool.acquire() as conn:
             await conn.execute('''
@@ -248,47 +369,86 @@ async def add_channel(channel_id: str, channel_name: str):
                 VALUES ($1, $2)
                 ON CONFLICT (channel_id) DO UPDATE SET channel_name = $2
             ''', channel_id, channel_name)
+        if _channels_cache is not None:
+            _channels_cache[channel_id] = channel_name
     except Exception as e:
         logger.error(f"Error adding channel {channel_name}: {e}")
 
-async def remove_channel(channel_id: str):
-    """Remove channel from database"""
+async def remove_channel(channel_id: str) -> Optional[str]:
+    """Remove channel from database, returning its name if it existed"""
     if is_shutting_down:
-        return
-    
+        return None
+
     try:
         async with db_pool.acquire() as conn:
-            await conn.execute('DELETE FROM channels WHERE channel_id = $1', channel_id)
-            await conn.execute('DELETE FROM channel_groups WHERE channel_id = $1', channel_id)
+            # Both deletes in one transaction so a crash can't leave
+            # orphaned group memberships behind
+            async with conn.transaction():
+                name = await conn.fetchval(
+                    'DELETE FROM channels WHERE channel_id = $1 RETURNING channel_name',
+                    channel_id
+                )
+                await conn.execute('DELETE FROM channel_groups WHERE channel_id = $1', channel_id)
+        if _channels_cache is not None:
+            _channels_cache.pop(channel_id, None)
+        _chat_cache.pop(channel_id, None)
+        return name
     except Exception as e:
         logger.error(f"Error removing channel {channel_id}: {e}")
+        return None
 
 async def get_all_channels() -> Dict[str, str]:
     """Get all channels"""
     if not db_pool or is_shutting_down:
         return {}
-    
+
+    if _channels_cache is not None:
+        # Copy so callers iterating during a slow fan-out aren't bitten by
+        # a concurrent add/remove mutating the mirror
+        return dict(_channels_cache)
+
     try:
         async with db_pool.acquire() as conn:
             rows = await conn.fetch('SELECT channel_id, channel_name FROM channels')
-            return {row['channel_id']: row['channel_name'] for row in rows}
+            # Records are sequences, so dict() consumes them without
+            # per-row string-key lookups
+            return dict(rows)
     except Exception:
         return {}
 
-async def update_channel_status(channel_id: str, status: str):
-    """Update channel status"""
-    if is_shutting_down:
-        return
-    
+async def get_channel_name(channel_id: str) -> Optional[str]:
+    """Get a single channel's name, or None if it isn't monitored"""
+    if not db_pool or is_shutting_down:
+        return None
+
+    if _channels_cache is not None:
+        return _channels_cache.get(channel_id)
+
     try:
         async with db_pool.acquire() as conn:
-            await conn.execute('''
-                UPDATE channels 
-                SET status = $2, last_check = NOW()
-                WHERE channel_id = $1
-            ''', channel_id, status)
-    except Exception as e:
-        logger.error(f"Error updating channel status {channel_id}: {e}")
+            return await conn.fetchval(
+                'SELECT channel_name FROM channels WHERE channel_id = $1', channel_id
+            )
+    except Exception:
+        return None
+
+async def get_channel_names(channel_ids: List[str]) -> Dict[str, str]:
+    """Get names for just the given channels"""
+    if not db_pool or is_shutting_down:
+        return {}
+
+    if _channels_cache is not None:
+        return {cid: _channels_cache[cid] for cid in channel_ids if cid in _channels_cache}
+
+    try:
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                'SELECT channel_id, channel_name FROM channels WHERE channel_id = ANY($1::text[])',
+                channel_ids
+            )
+        return dict(rows)
+    except Exception:
+        return {}
 
 # Channel groups functions
 async def add_channel_to_group(group_name: str, channel_id: str):
@@ -335,20 +495,26 @@ async def get_group_channels(group_name: str) -> List[str]:
     except Exception:
         return []
 
-async def get_all_groups() -> Dict[str, List[str]]:
+async def get_all_groups(conn=None) -> Dict[str, List[str]]:
     """Get all groups with their channels"""
     if not db_pool or is_shutting_down:
         return {}
-    
+
+    # Postgres groups the rows; asyncpg decodes array_agg straight into a
+    # Python list, so there is no per-row merging here
+    query = '''
+        SELECT group_name, array_agg(channel_id) AS channel_ids
+        FROM channel_groups
+        GROUP BY group_name
+    '''
+
     try:
-        async with db_pool.acquire() as conn:
-            rows = await conn.fetch('SELECT group_name, channel_id FROM channel_groups')
-            groups = {}
-            for row in rows:
-                if row['group_name'] not in groups:
-                    groups[row['group_name']] = []
-                groups[row['group_name']].append(row['channel_id'])
-            return groups
+        if conn is not None:
+            rows = await conn.fetch(query)
+        else:
+            async with db_pool.acquire() as conn:
+                rows = await conn.fetch(query)
+        return {row[0]: row[1] for row in rows}
     except Exception:
         return {}
 
@@ -363,36 +529,88 @@ async def delete_group(group_name: str):
     except Exception as e:
         logger.error(f"Error deleting group {group_name}: {e}")
 
+# Short-lived LRU cache for get_chat lookups (avoids a Telegram round-trip
+# when admins re-add or re-validate the same channel)
+_chat_cache: OrderedDict = OrderedDict()
+_CHAT_CACHE_TTL = 300  # seconds
+_CHAT_CACHE_MAX = 256
+
+async def get_cached_chat(bot, channel_id: str):
+    """Get chat info from Telegram, caching results for a few minutes"""
+    cached = _chat_cache.get(channel_id)
+    if cached:
+        ts, chat = cached
+        if time.monotonic() - ts < _CHAT_CACHE_TTL:
+            _chat_cache.move_to_end(channel_id)
+            return chat
+        del _chat_cache[channel_id]
+
+    chat = await bot.get_chat(channel_id)
+    _chat_cache[channel_id] = (time.monotonic(), chat)
+    if len(_chat_cache) > _CHAT_CACHE_MAX:
+        _chat_cache.popitem(last=False)
+    return chat
+
+# Broadcast queue functions
+async def enqueue_broadcast(broadcast_id: str, channel_ids, from_chat_id: int, message_id: int):
+    """Persist a broadcast's per-channel work items so a restart can resume it"""
+    if is_shutting_down:
+        return
+
+    try:
+        rows = [(broadcast_id, cid, from_chat_id, message_id) for cid in channel_ids]
+        async with db_pool.acquire() as conn:
+            await conn.executemany('''
+                INSERT INTO broadcast_queue (broadcast_id, channel_id, from_chat_id, message_id)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT DO NOTHING
+            ''', rows)
+    except Exception as e:
+        logger.error(f"Error enqueuing broadcast {broadcast_id}: {e}")
+
+async def mark_broadcast_sent(broadcast_id: str, channel_id: str):
+    """Drop a delivered channel from the broadcast queue"""
+    try:
+        async with db_pool.acquire() as conn:
+            await conn.execute(
+                'DELETE FROM broadcast_queue WHERE broadcast_id = $1 AND channel_id = $2',
+                broadcast_id, channel_id
+            )
+    except Exception as e:
+        logger.error(f"Error marking broadcast row sent: {e}")
+
+async def clear_broadcast(broadcast_id: str):
+    """Remove a finished broadcast (including channels that failed for good)"""
+    try:
+        async with db_pool.acquire() as conn:
+            await conn.execute(
+                'DELETE FROM broadcast_queue WHERE broadcast_id = $1', broadcast_id
+            )
+    except Exception as e:
+        logger.error(f"Error clearing broadcast {broadcast_id}: {e}")
+
+# Table-driven time parsing: one regex match + dict lookup instead of a
+# chain of endswith branches
+_TIME_RE = re.compile(r'^(\d+)\s*([smhd]?)$')
+_TIME_MULTIPLIERS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
 def parse_time_to_seconds(time_str: str) -> int:
     """Convert time string to seconds"""
-    time_str = time_str.lower().strip()
-    if not time_str:
-        return 0
-    
-    try:
-        if time_str.endswith('s'):
-            return int(time_str[:-1])
-        elif time_str.endswith('m'):
-            return int(time_str[:-1]) * 60
-        elif time_str.endswith('h'):
-            return int(time_str[:-1]) * 3600
-        elif time_str.endswith('d'):
-            return int(time_str[:-1]) * 86400
-        else:
-            return int(time_str)
-    except ValueError:
+    match = _TIME_RE.match(time_str.lower().strip())
+    if not match:
         return 0
+    return int(match.group(1)) * _TIME_MULTIPLIERS[match.group(2)]
 
+@lru_cache(maxsize=128)
 def seconds_to_readable(seconds: int) -> str:
     """Convert seconds to readable format"""
     if seconds <= 0:
         return "0s"
     
-    days = seconds // 86400
-    hours = (seconds % 86400) // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
-    
+    days, rem = divmod(seconds, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, secs = divmod(rem, 60)
+
     parts = []
     if days > 0:
         parts.append(f"{days}d")
@@ -402,11 +620,112 @@ def seconds_to_readable(seconds: int) -> str:
         parts.append(f"{minutes}m")
     if secs > 0 or not parts:
         parts.append(f"{secs}s")
-    
+
     return " ".join(parts)
 
 # ==================== COMMAND HANDLERS ====================
 
+_ADMIN_REJECT = "❌ Only admins can use this command."
+
+# Cap on in-flight broadcast sends; keeps bursts under Telegram's
+# ~30 msg/s global budget with a little headroom
+BROADCAST_CONCURRENCY = 20
+
+# Failure-alert template for the periodic checker; one aggregated alert
+# per cycle, built once at import
+_CHECK_ALERT_TMPL = (
+    "⚠️ *Channel Check Failed*\n\n"
+    "🕐 Time: {ts}\n"
+    "❌ Failed ({count}):\n{failures}"
+).format
+
+# /status reply template, built once at import; bound .format keeps the
+# per-call work to substitutions only
+_STATUS_TMPL = (
+    "⚙️ *Bot Configuration:*\n\n"
+    "Status: {status}\n"
+    "👤 Owner: {owner}\n"
+    "👥 Admins: {admins}\n"
+    "📢 Channels: {channels}\n"
+    "📂 Groups: {groups}\n"
+    "⏱ Check Interval: {check}\n"
+    "🗑 Delete Interval: {delete}\n"
+    "💬 Test Message: {test_message}"
+).format
+
+def require_admin(handler):
+    """Run the wrapped handler only for admins (silently drops updates during shutdown)"""
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if is_shutting_down:
+            return
+        if not await is_admin(update.effective_user.id):
+            await update.message.reply_text(_ADMIN_REJECT)
+            return
+        return await handler(update, context)
+    return wrapper
+
+# Help texts are static, so build them once at import instead of on every
+# /help invocation
+HELP_ADMIN_TEXT = (
+    "<b>📋 Channel Monitor Bot Commands</b>\n\n"
+
+    "<b>👥 Admin Management:</b>\n"
+    "• /add_admin &lt;user_id&gt; - Add a new bot admin\n"
+    "• /remove_admin &lt;user_id&gt; - Remove an existing bot admin\n\n"
+
+    "<b>📢 Channel Management:</b>\n"
+    "• /add_channel &lt;@username or -100ID&gt; &lt;name&gt; - Add a channel to monitor\n"
+    "• /remove_channel &lt;@username or -100ID&gt; - Remove a channel from monitor list\n"
+    "• /list - Show all monitored channels\n\n"
+
+    "<b>📂 Group Management:</b>\n"
+    "• /create_group &lt;group_name&gt; - Create a new channel group\n"
+    "• /add_to_group &lt;group_name&gt; &lt;channel_id&gt; - Add a channel into a group\n"
+    "• /remove_from_group &lt;group_name&gt; &lt;channel_id&gt; - Remove a channel from a group\n"
+    "• /list_groups - Show all groups with their channels\n"
+    "• /delete_group &lt;group_name&gt; - Delete an entire group\n\n"
+
+    "<b>⚙️ Configuration:</b>\n"
+    "• /time_period &lt;time&gt; - Set how often channels are checked\n"
+    "  <i>Format: 30s, 5m, 1h, 12h, 1d</i>\n"
+    "• /test_message &lt;text&gt; - Set the message sent during channel check\n"
+    "• /delete_interval &lt;time&gt; - Set how long before test message is deleted\n"
+    "  <i>Format: 3s, 10s, 1m</i>\n"
+    "• /status - Show all current bot settings\n\n"
+
+    "<b>📡 Channel Name Update:</b>\n"
+    "• /updatename - Fetch and update all channel names from Telegram\n"
+
+    "<b>📡 Broadcast:</b>\n"
+    "• /broadcast - Reply to any message to send it to ALL channels\n"
+    "• /publish &lt;group_name&gt; - Reply to any message to send it to a specific group\n\n"
+
+    "<b>👑 Channel Admin Control:</b>\n"
+    "• /promote &lt;user_id&gt; - Promote user as admin in ALL channels\n"
+    "• /promote &lt;user_id&gt; &lt;@channel or -100ID&gt; - Promote in a specific channel\n"
+    "• /demote &lt;user_id&gt; - Remove admin rights in ALL channels\n"
+    "• /demote &lt;user_id&gt; &lt;@channel or -100ID&gt; - Remove admin rights in specific channel\n"
+    "  <i>Permissions based on PROMOTE_PERMISSIONS list in code</i>\n\n"
+
+    "<b>📊 Stats:</b>\n"
+    "• /usercount - Get total member count across all channels\n\n"
+
+    "<b>🔧 Bot Control:</b>\n"
+    "• /on - Turn channel monitoring ON\n"
+    "• /off - Turn channel monitoring OFF\n\n"
+
+    "<b>❓ Help:</b>\n"
+    "• /help - Show this help message"
+)
+
+HELP_USER_TEXT = (
+    "<b>📋 Channel Monitor Bot</b>\n\n"
+    "Available commands:\n"
+    "• /start - Start the bot\n"
+    "• /help - Show this message"
+)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start command"""
     if is_shutting_down:
@@ -414,14 +733,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     user_id = update.effective_user.id
-    version = os.getenv('BOT_VERSION', '2.0.0')
     owner = await get_owner()
     
     if owner == 0:
         await set_owner(user_id)
         await update.message.reply_text(
             f"🎉 *Welcome! You are now the Owner.*\n\n"
-            f"🤖 Bot Version: {version}\n\n"
+            f"🤖 Bot Version: {BOT_VERSION}\n\n"
             "Use /help to see all available commands.",
             parse_mode='Markdown'
         )
@@ -433,7 +751,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         await update.message.reply_text(
             f"👋 *Channel Monitor Bot*\n\n"
-            f"🤖 Version: {version}\n"
+            f"🤖 Version: {BOT_VERSION}\n"
             f"Status: {status}\n"
             f"Owner: {owner}\n"
             f"Admins: {admins_count}\n"
@@ -448,67 +766,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     user_id = update.effective_user.id
-    
-    if await is_admin(user_id):
-        help_text = (
-            "<b>📋 Channel Monitor Bot Commands</b>\n\n"
-
-            "<b>👥 Admin Management:</b>\n"
-            "• /add_admin &lt;user_id&gt; - Add a new bot admin\n"
-            "• /remove_admin &lt;user_id&gt; - Remove an existing bot admin\n\n"
-
-            "<b>📢 Channel Management:</b>\n"
-            "• /add_channel &lt;@username or -100ID&gt; &lt;name&gt; - Add a channel to monitor\n"
-            "• /remove_channel &lt;@username or -100ID&gt; - Remove a channel from monitor list\n"
-            "• /list - Show all monitored channels\n\n"
-
-            "<b>📂 Group Management:</b>\n"
-            "• /create_group &lt;group_name&gt; - Create a new channel group\n"
-            "• /add_to_group &lt;group_name&gt; &lt;channel_id&gt; - Add a channel into a group\n"
-            "• /remove_from_group &lt;group_name&gt; &lt;channel_id&gt; - Remove a channel from a group\n"
-            "• /list_groups - Show all groups with their channels\n"
-            "• /delete_group &lt;group_name&gt; - Delete an entire group\n\n"
-
-            "<b>⚙️ Configuration:</b>\n"
-            "• /time_period &lt;time&gt; - Set how often channels are checked\n"
-            "  <i>Format: 30s, 5m, 1h, 12h, 1d</i>\n"
-            "• /test_message &lt;text&gt; - Set the message sent during channel check\n"
-            "• /delete_interval &lt;time&gt; - Set how long before test message is deleted\n"
-            "  <i>Format: 3s, 10s, 1m</i>\n"
-            "• /status - Show all current bot settings\n\n"
-
-            "<b>📡 Channel Name Update:</b>\n"
-            "• /updatename - Fetch and update all channel names from Telegram\n"
-
-            "<b>📡 Broadcast:</b>\n"
-            "• /broadcast - Reply to any message to send it to ALL channels\n"
-            "• /publish &lt;group_name&gt; - Reply to any message to send it to a specific group\n\n"
-
-            "<b>👑 Channel Admin Control:</b>\n"
-            "• /promote &lt;user_id&gt; - Promote user as admin in ALL channels\n"
-            "• /promote &lt;user_id&gt; &lt;@channel or -100ID&gt; - Promote in a specific channel\n"
-            "• /demote &lt;user_id&gt; - Remove admin rights in ALL channels\n"
-            "• /demote &lt;user_id&gt; &lt;@channel or -100ID&gt; - Remove admin rights in specific channel\n"
-            "  <i>Permissions based on PROMOTE_PERMISSIONS list in code</i>\n\n"
-
-            "<b>📊 Stats:</b>\n"
-            "• /usercount - Get total member count across all channels\n\n"
-
-            "<b>🔧 Bot Control:</b>\n"
-            "• /on - Turn channel monitoring ON\n"
-            "• /off - Turn channel monitoring OFF\n\n"
-
-            "<b>❓ Help:</b>\n"
-            "• /help - Show this help message"
-        )
-    else:
-        help_text = (
-            "<b>📋 Channel Monitor Bot</b>\n\n"
-            "Available commands:\n"
-            "• /start - Start the bot\n"
-            "• /help - Show this message"
-        )
-    
+    help_text = HELP_ADMIN_TEXT if await is_admin(user_id) else HELP_USER_TEXT
     await update.message.reply_text(help_text, parse_mode='HTML')
 async def add_admin_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add admin command"""
@@ -555,15 +813,9 @@ async def remove_admin_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except ValueError:
         await update.message.reply_text("❌ Invalid user ID.")
 
+@require_admin
 async def add_channel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add channel command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if len(context.args) < 2:
         await update.message.reply_text(
             "Usage: /add_channel <@username or -100ID> <name>\n\n"
@@ -577,7 +829,7 @@ async def add_channel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     channel_name = ' '.join(context.args[1:])
     
     try:
-        chat = await context.bot.get_chat(channel_id)
+        chat = await get_cached_chat(context.bot, channel_id)
         actual_name = chat.title or channel_name
         
         await add_channel(channel_id, channel_name)
@@ -599,37 +851,24 @@ async def add_channel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         await add_channel(channel_id, channel_name)
 
+@require_admin
 async def remove_channel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove channel command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text("Usage: /remove_channel <@username or ID>")
         return
     
     channel_id = context.args[0]
-    channels = await get_all_channels()
-    
-    if channel_id in channels:
-        await remove_channel(channel_id)
-        await update.message.reply_text(f"✅ Channel '{channels[channel_id]}' removed!")
+    removed_name = await remove_channel(channel_id)
+
+    if removed_name is not None:
+        await update.message.reply_text(f"✅ Channel '{removed_name}' removed!")
     else:
         await update.message.reply_text("❌ Channel not found.")
 
+@require_admin
 async def create_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Create channel group"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text("Usage: /create_group <group_name>")
         return
@@ -637,15 +876,9 @@ async def create_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     group_name = context.args[0]
     await update.message.reply_text(f"✅ Group '{group_name}' created!\n\nUse /add_to_group to add channels.")
 
+@require_admin
 async def add_to_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add channel to group"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if len(context.args) < 2:
         await update.message.reply_text(
             "Usage: /add_to_group <group_name> <channel_id>\n\n"
@@ -655,24 +888,18 @@ async def add_to_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     group_name = context.args[0]
     channel_id = context.args[1]
-    
-    channels = await get_all_channels()
-    if channel_id not in channels:
+
+    channel_name = await get_channel_name(channel_id)
+    if channel_name is None:
         await update.message.reply_text(f"❌ Channel {channel_id} not found. Add it first with /add_channel")
         return
-    
+
     await add_channel_to_group(group_name, channel_id)
-    await update.message.reply_text(f"✅ Channel {channels[channel_id]} added to group '{group_name}'!")
+    await update.message.reply_text(f"✅ Channel {channel_name} added to group '{group_name}'!")
 
+@require_admin
 async def remove_from_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove channel from group"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if len(context.args) < 2:
         await update.message.reply_text("Usage: /remove_from_group <group_name> <channel_id>")
         return
@@ -683,15 +910,9 @@ async def remove_from_group_cmd(update: Update, context: ContextTypes.DEFAULT_TY
     await remove_channel_from_group(group_name, channel_id)
     await update.message.reply_text(f"✅ Channel removed from group '{group_name}'!")
 
+@require_admin
 async def list_groups_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all groups"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     groups = await get_all_groups()
     channels = await get_all_channels()
     
@@ -709,15 +930,9 @@ async def list_groups_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await update.message.reply_text(msg, parse_mode='Markdown')
 
+@require_admin
 async def delete_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Delete group"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text("Usage: /delete_group <group_name>")
         return
@@ -726,15 +941,9 @@ async def delete_group_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await delete_group(group_name)
     await update.message.reply_text(f"✅ Group '{group_name}' deleted!")
 
+@require_admin
 async def update_channel_names_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Fetch and update all channel names from Telegram"""
-    if is_shutting_down:
-        return
-
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-
     channels = await get_all_channels()
     if not channels:
         await update.message.reply_text("❌ No channels added.")
@@ -773,15 +982,9 @@ async def update_channel_names_cmd(update: Update, context: ContextTypes.DEFAULT
 
     await status_msg.edit_text(report, parse_mode='HTML')
     
+@require_admin
 async def time_period_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Set time period command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text(
             "Usage: /time_period <time>\n\n"
@@ -796,19 +999,11 @@ async def time_period_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         
         await set_config('check_interval', str(interval))
-        
+
         # Reschedule job
-        jobs = context.job_queue.get_jobs_by_name('channel_check')
-        for job in jobs:
-            job.schedule_removal()
-        
-        context.job_queue.run_repeating(
-            check_channel_status,
-            interval=interval,
-            first=10,
-            name='channel_check'
-        )
-        
+        _reschedule_channel_check(context.job_queue, interval, first=10)
+
+
         readable = seconds_to_readable(interval)
         await update.message.reply_text(f"✅ Check interval set to {readable}!")
     except ValueError:
@@ -835,15 +1030,9 @@ ALL_POSSIBLE_PERMISSIONS = [
 ]
 
 
+@require_admin
 async def promote_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Promote user to admin in channel(s)"""
-    if is_shutting_down:
-        return
-
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-
     if len(context.args) < 1:
         await update.message.reply_text(
             "<b>👑 Promote Command Guide</b>\n\n"
@@ -976,15 +1165,9 @@ async def promote_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
     await query.edit_message_text(report, parse_mode='HTML')    
+@require_admin
 async def demote_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Demote admin to regular user in channel(s)"""
-    if is_shutting_down:
-        return
-
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-
     if len(context.args) < 1:
         await update.message.reply_text(
             "Usage:\n"
@@ -1046,15 +1229,9 @@ async def demote_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     await status_msg.edit_text(report, parse_mode='Markdown')
 
+@require_admin
 async def test_message_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Set test message command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text("Usage: /test_message <your message>")
         return
@@ -1063,15 +1240,9 @@ async def test_message_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await set_config('test_message', message)
     await update.message.reply_text(f"✅ Test message set to:\n\n{message}")
 
+@require_admin
 async def delete_interval_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Set delete interval command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text(
             "Usage: /delete_interval <time>\n\n"
@@ -1090,73 +1261,54 @@ async def delete_interval_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE
     except ValueError:
         await update.message.reply_text("❌ Invalid format. Use: 3s, 10s, 1m, etc.")
 
+@require_admin
 async def list_channels_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List channels command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     channels = await get_all_channels()
     
     if not channels:
         await update.message.reply_text("📋 No channels being monitored.")
         return
     
-    channels_list = []
-    for idx, (ch_id, ch_name) in enumerate(channels.items(), 1):
-        channels_list.append(f"{idx}. {ch_name}\n   ID: `{ch_id}`")
-    
-    msg = "📋 *Monitored Channels:*\n\n" + "\n\n".join(channels_list)
+    msg = "📋 *Monitored Channels:*\n\n" + "\n\n".join(
+        f"{idx}. {ch_name}\n   ID: `{ch_id}`"
+        for idx, (ch_id, ch_name) in enumerate(channels.items(), 1)
+    )
     await update.message.reply_text(msg, parse_mode='Markdown')
 
+@require_admin
 async def status_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Status command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
-    bot_active = await get_config('bot_active')
-    bot_status = "🟢 ACTIVE" if bot_active == 'true' else "🔴 INACTIVE"
-    
-    check_interval = int(await get_config('check_interval') or 3600)
-    delete_interval = int(await get_config('delete_interval') or 3)
-    test_message = await get_config('test_message') or '✅ Bot is active!'
+    # One pool acquisition for everything /status needs from the DB
+    async with db_pool.acquire() as conn:
+        cfg = await get_many_configs(
+            ['bot_active', 'check_interval', 'delete_interval', 'test_message'], conn=conn
+        )
+        admins_count = await get_admins_count(conn=conn)
+        groups = await get_all_groups(conn=conn)
+
+    bot_status = "🟢 ACTIVE" if cfg.get('bot_active') == 'true' else "🔴 INACTIVE"
+    check_interval = int(cfg.get('check_interval') or 3600)
+    delete_interval = int(cfg.get('delete_interval') or 3)
+    test_message = cfg.get('test_message') or '✅ Bot is active!'
     owner = await get_owner()
-    admins_count = await get_admins_count()
     channels = await get_all_channels()
-    groups = await get_all_groups()
-    
-    check_readable = seconds_to_readable(check_interval)
-    delete_readable = seconds_to_readable(delete_interval)
     
-    status_msg = (
-        f"⚙️ *Bot Configuration:*\n\n"
-        f"Status: {bot_status}\n"
-        f"👤 Owner: {owner}\n"
-        f"👥 Admins: {admins_count}\n"
-        f"📢 Channels: {len(channels)}\n"
-        f"📂 Groups: {len(groups)}\n"
-        f"⏱ Check Interval: {check_readable}\n"
-        f"🗑 Delete Interval: {delete_readable}\n"
-        f"💬 Test Message: {test_message}"
+    status_msg = _STATUS_TMPL(
+        status=bot_status,
+        owner=owner,
+        admins=admins_count,
+        channels=len(channels),
+        groups=len(groups),
+        check=seconds_to_readable(check_interval),
+        delete=seconds_to_readable(delete_interval),
+        test_message=test_message,
     )
     await update.message.reply_text(status_msg, parse_mode='Markdown')
 
+@require_admin
 async def bot_off_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Turn bot off command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     bot_active = await get_config('bot_active')
     if bot_active == 'false':
         await update.message.reply_text("ℹ️ Bot already inactive.")
@@ -1169,15 +1321,9 @@ async def bot_off_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     logger.info("Bot turned OFF")
 
+@require_admin
 async def bot_on_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Turn bot on command"""
-    if is_shutting_down:
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     bot_active = await get_config('bot_active')
     if bot_active == 'true':
         await update.message.reply_text("ℹ️ Bot already active.")
@@ -1191,16 +1337,9 @@ async def bot_on_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     logger.info("Bot turned ON")
 
+@require_admin
 async def broadcast_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Broadcast command"""
-    if is_shutting_down:
-        await update.message.reply_text("⚠️ Bot is shutting down. Please try again later.")
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     # Check if replying to a message
     if not update.message.reply_to_message:
         await update.message.reply_text(
@@ -1214,61 +1353,139 @@ async def broadcast_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ No channels to broadcast to.")
         return
     
-    broadcast_delay = float(await get_config('broadcast_delay') or 0.5)
-    
-    successful = 0
-    failed = 0
-    failed_channels = []
-    
     status_msg = await update.message.reply_text("📡 Broadcasting... 0%")
+
+    source = update.message.reply_to_message
+    broadcast_id = uuid.uuid4().hex
+    await enqueue_broadcast(broadcast_id, channels, source.chat_id, source.message_id)
+
+    # Run the fan-out in the background so the handler (and the update
+    # dispatcher behind it) isn't blocked for the whole broadcast
+    asyncio.create_task(_do_broadcast(
+        context.bot, source.chat_id, source.message_id, status_msg, channels,
+        broadcast_id=broadcast_id
+    ))
+
+async def _do_broadcast(bot, from_chat_id, message_id, status_msg, channels,
+                        progress_text="📡 Broadcasting... {progress}%",
+                        report_title="📊 *Broadcast Report:*",
+                        broadcast_id=None):
+    """Copy a message to every given channel and edit status_msg with the report
+
+    With a broadcast_id, delivered channels are removed from the persisted
+    queue as they complete so a restart resumes where this run stopped.
+    status_msg may be None (resumed broadcasts log the report instead).
+    """
     total_channels = len(channels)
-    
-    for idx, (channel_id, channel_name) in enumerate(channels.items(), 1):
-        try:
-            # Forward or copy the message with all formatting
-            await update.message.reply_to_message.copy(chat_id=channel_id)
-            successful += 1
-            
-            # Update progress every 10 channels or 10%
-            if idx % 10 == 0 or idx == total_channels:
-                progress = int((idx / total_channels) * 100)
+
+    # Fan out sends concurrently; the semaphore keeps us under Telegram's
+    # global rate limit instead of serializing on per-channel round-trips
+    sem = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    done = 0
+    last_edit = 0.0
+    successful = 0
+    failed = 0
+
+    # Keep only a small sample of failures in memory; the full list goes
+    # to a per-broadcast log on disk
+    failed_sample = deque(maxlen=5)
+    error_counts = Counter()
+    log_path = f"/tmp/broadcast_{broadcast_id}.log" if broadcast_id else None
+    failure_log = open(log_path, 'w') if log_path else None
+
+    async def send_one(channel_id, channel_name):
+        nonlocal done, last_edit, successful, failed
+        async with sem:
+            error = None
+            for attempt in range(3):
+                try:
+                    # Copy keeps all formatting without a "forwarded" header
+                    await bot.copy_message(
+                        chat_id=channel_id,
+                        from_chat_id=from_chat_id,
+                        message_id=message_id
+                    )
+                    error = None
+                    break
+                except RetryAfter as e:
+                    # Flood control isn't a dead channel; wait what
+                    # Telegram asked for and try again
+                    error = e
+                    await asyncio.sleep(e.retry_after)
+                except TimedOut as e:
+                    error = e
+                    await asyncio.sleep(attempt + 1)
+                except Exception as e:
+                    error = e
+                    break
+
+            if error is not None:
+                logger.error("Broadcast failed: %s - %s", channel_name, error)
+                failed += 1
+                # The class name is enough to categorize; the full
+                # message only goes to the disk log
+                error_counts[type(error).__name__] += 1
+                failed_sample.append(f"{channel_name}: {type(error).__name__}")
+                if failure_log is not None:
+                    failure_log.write(f"{channel_name}\t{error}\n")
+            else:
+                successful += 1
+                if broadcast_id is not None:
+                    await mark_broadcast_sent(broadcast_id, channel_id)
+
+        done += 1
+        # Progress edits count against the status chat's 1 msg/s budget,
+        # so coalesce them to at most one every 2 seconds
+        if status_msg is not None:
+            now = time.monotonic()
+            if now - last_edit >= 2.0 or done == total_channels:
+                last_edit = now
+                progress = int((done / total_channels) * 100)
                 try:
-                    await status_msg.edit_text(f"📡 Broadcasting... {progress}%")
+                    await status_msg.edit_text(progress_text.format(progress=progress))
                 except:
                     pass
-            
-            if broadcast_delay > 0:
-                await asyncio.sleep(broadcast_delay)
-                
-        except Exception as e:
-            logger.error(f"Broadcast failed: {channel_name} - {e}")
-            failed += 1
-            failed_channels.append(f"{channel_name}: {str(e)[:50]}")
-    
+
+    await asyncio.gather(
+        *(send_one(cid, name) for cid, name in channels.items())
+    )
+
+    if failure_log is not None:
+        failure_log.close()
+        if failed == 0:
+            os.remove(log_path)
+
     report = (
-        f"📊 *Broadcast Report:*\n\n"
+        f"{report_title}\n\n"
         f"✅ Successful: {successful}\n"
         f"❌ Failed: {failed}\n"
         f"📢 Total: {total_channels}"
+        + (
+            "\n⚠️ Errors: " + ", ".join(f"{n} {cls}" for cls, n in error_counts.most_common())
+            + "\n\n*Failed Channels:*\n"
+            + "\n".join(f"• {fc}" for fc in failed_sample)
+            + (f"\n... and {failed - 5} more" if failed > 5 else "")
+            if failed else ""
+        )
     )
-    
-    if failed_channels:
-        report += "\n\n⚠️ *Failed Channels:*\n" + "\n".join([f"• {fc}" for fc in failed_channels[:5]])
-        if len(failed_channels) > 5:
-            report += f"\n... and {len(failed_channels) - 5} more"
-    
-    await status_msg.edit_text(report, parse_mode='Markdown')
 
+    # Whatever is left in the queue now failed its retries; drop it so a
+    # restart doesn't replay permanently dead channels
+    if broadcast_id is not None:
+        await clear_broadcast(broadcast_id)
+
+    if status_msg is None:
+        logger.info("Resumed broadcast finished: %d sent, %d failed", successful, failed)
+        return
+
+    try:
+        await status_msg.edit_text(report, parse_mode='Markdown')
+    except Exception as e:
+        logger.error("Failed to post broadcast report: %s", e)
+
+@require_admin
 async def publish_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Publish command - broadcast to specific group"""
-    if is_shutting_down:
-        await update.message.reply_text("⚠️ Bot is shutting down. Please try again later.")
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     if not context.args:
         await update.message.reply_text(
             "Usage: Reply to a message and type /publish <group_name>\n\n"
@@ -1293,95 +1510,56 @@ async def publish_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    channels = await get_all_channels()
-    broadcast_delay = float(await get_config('broadcast_delay') or 0.5)
-    
-    successful = 0
-    failed = 0
-    failed_channels = []
-    
+    names = await get_channel_names(channel_ids)
+
+    group_channels = {cid: names.get(cid, "Unknown") for cid in channel_ids}
+
     status_msg = await update.message.reply_text(f"📡 Publishing to group '{group_name}'... 0%")
-    total_channels = len(channel_ids)
-    
-    for idx, channel_id in enumerate(channel_ids, 1):
-        channel_name = channels.get(channel_id, "Unknown")
-        try:
-            # Copy message with all formatting
-            await update.message.reply_to_message.copy(chat_id=channel_id)
-            successful += 1
-            
-            # Update progress
-            if idx % 5 == 0 or idx == total_channels:
-                progress = int((idx / total_channels) * 100)
-                try:
-                    await status_msg.edit_text(f"📡 Publishing to group '{group_name}'... {progress}%")
-                except:
-                    pass
-            
-            if broadcast_delay > 0:
-                await asyncio.sleep(broadcast_delay)
-                
-        except Exception as e:
-            logger.error(f"Publish failed: {channel_name} - {e}")
-            failed += 1
-            failed_channels.append(f"{channel_name}: {str(e)[:50]}")
-    
-    report = (
-        f"📊 *Publish Report (Group: {group_name}):*\n\n"
-        f"✅ Successful: {successful}\n"
-        f"❌ Failed: {failed}\n"
-        f"📢 Total: {total_channels}"
-    )
-    
-    if failed_channels:
-        report += "\n\n⚠️ *Failed Channels:*\n" + "\n".join([f"• {fc}" for fc in failed_channels[:5]])
-        if len(failed_channels) > 5:
-            report += f"\n... and {len(failed_channels) - 5} more"
-    
-    await status_msg.edit_text(report, parse_mode='Markdown')
 
+    source = update.message.reply_to_message
+    broadcast_id = uuid.uuid4().hex
+    await enqueue_broadcast(broadcast_id, group_channels, source.chat_id, source.message_id)
+
+    # Same concurrent fan-out as /broadcast, run in the background
+    asyncio.create_task(_do_broadcast(
+        context.bot, source.chat_id, source.message_id, status_msg, group_channels,
+        progress_text=f"📡 Publishing to group '{group_name}'... {{progress}}%",
+        report_title=f"📊 *Publish Report (Group: {group_name}):*",
+        broadcast_id=broadcast_id
+    ))
+
+@require_admin
 async def usercount_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get user count across all channels"""
-    if is_shutting_down:
-        await update.message.reply_text("⚠️ Bot is shutting down. Please try again later.")
-        return
-    
-    if not await is_admin(update.effective_user.id):
-        await update.message.reply_text("❌ Only admins can use this command.")
-        return
-    
     channels = await get_all_channels()
     
     if not channels:
         await update.message.reply_text("❌ No channels to count users from.")
         return
     
-    status_msg = await update.message.reply_text("🔄 Fetching user counts... 0%")
-    
-    channel_counts = {}
-    failed_channels = []
-    total_members = 0
-    total_channels = len(channels)
-    
-    for idx, (channel_id, channel_name) in enumerate(channels.items(), 1):
-        try:
-            member_count = await context.bot.get_chat_member_count(channel_id)
-            channel_counts[channel_name] = member_count
-            total_members += member_count
-            
-            # Update progress every 5 channels
-            if idx % 5 == 0:
-                progress = int((idx / total_channels) * 100)
-                try:
-                    await status_msg.edit_text(f"🔄 Fetching user counts... {progress}%")
-                except:
-                    pass
-            
-            await asyncio.sleep(0.3)  # Rate limiting
-            
-        except Exception as e:
-            logger.error(f"Failed to get count for {channel_name}: {e}")
-            failed_channels.append(channel_name)
+    status_msg = await update.message.reply_text("🔄 Fetching user counts...")
+
+    # getChatMemberCount is a read, so it isn't subject to the send-rate
+    # budget; fan the lookups out under a generous concurrency cap
+    sem = asyncio.Semaphore(30)
+
+    async def count_one(channel_id, channel_name):
+        async with sem:
+            try:
+                return channel_name, await context.bot.get_chat_member_count(channel_id)
+            except Exception as e:
+                logger.error("Failed to get count for %s: %s", channel_name, e)
+                return channel_name, None
+
+    results = await asyncio.gather(
+        *(count_one(cid, name) for cid, name in channels.items())
+    )
+
+    channel_counts = {name: count for name, count in results if count is not None}
+    failed_channels = [name for name, count in results if count is None]
+    # Sum from results, not the dict — duplicate display names would
+    # otherwise collapse and undercount the total
+    total_members = sum(count for _, count in results if count is not None)
     
     # Create report
     report = "📊 *User Count Report:*\n\n"
@@ -1408,59 +1586,207 @@ async def usercount_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # ==================== BACKGROUND TASKS ====================
 
+# (from_chat_id, message_id, text) of the stored test message, if any
+_test_template = None
+
+# Handle on the scheduled check job so rescheduling is an O(1) cancel
+# instead of a scan of the job store by name
+_channel_check_job = None
+
+def _reschedule_channel_check(job_queue, interval: int, first: int):
+    """(Re)schedule the periodic channel check, replacing any existing job"""
+    global _channel_check_job
+    if _channel_check_job is not None:
+        _channel_check_job.schedule_removal()
+        _channel_check_job = None
+
+    if interval > 0:
+        _channel_check_job = job_queue.run_repeating(
+            check_channel_status,
+            interval=interval,
+            first=first,
+            name='channel_check'
+        )
+
+async def _get_test_template(bot, test_message: str):
+    """Get (chat_id, message_id) of a stored test message, or None to send text directly"""
+    global _test_template
+    if not STORAGE_CHAT_ID:
+        return None
+
+    if _test_template and _test_template[2] == test_message:
+        return _test_template[:2]
+
+    try:
+        msg = await bot.send_message(
+            chat_id=STORAGE_CHAT_ID,
+            text=test_message,
+            parse_mode=ParseMode.HTML
+        )
+        _test_template = (msg.chat_id, msg.message_id, test_message)
+        return _test_template[:2]
+    except Exception as e:
+        logger.error("Failed to store test message template: %s", e)
+        return None
+
+async def _delete_test_message(context: ContextTypes.DEFAULT_TYPE):
+    """Delete a test message scheduled by check_channel_status"""
+    channel_id, message_id = context.job.data
+    try:
+        await context.bot.delete_message(chat_id=channel_id, message_id=message_id)
+        logger.debug("Test message deleted from: %s", channel_id)
+    except Exception:
+        pass  # Ignore deletion errors
+
 async def check_channel_status(context: ContextTypes.DEFAULT_TYPE):
     """Check channel status periodically"""
     if is_shutting_down:
         return
     
-    bot_active = await get_config('bot_active')
-    if bot_active != 'true':
+    cfg = await get_many_configs(['bot_active', 'test_message', 'delete_interval'])
+    if cfg.get('bot_active') != 'true':
         logger.debug("Bot is inactive, skipping channel check")
         return
-    
+
     channels = await get_all_channels()
     if not channels:
         logger.debug("No channels to check")
         return
-    
-    logger.info(f"🔍 Checking {len(channels)} channels...")
-    
-    test_message = await get_config('test_message') or '✅ Bot is active!'
-    delete_interval = int(await get_config('delete_interval') or 3)
-    
-    for channel_id, channel_name in channels.items():
+
+    logger.info("🔍 Checking %d channels...", len(channels))
+
+    test_message = cfg.get('test_message') or '✅ Bot is active!'
+    delete_interval = int(cfg.get('delete_interval') or 3)
+    template = await _get_test_template(context.bot, test_message)
+
+    owner = await get_owner()
+    admins = await get_all_admins()
+    recipients = [uid for uid in [owner, *admins] if uid]
+
+    # Second precision is plenty for the alert, so format the cycle
+    # timestamp once instead of per failed channel
+    cycle_ts = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Failures collected during the fan-out; one aggregated alert goes out
+    # afterwards so a mass outage can't flood every admin's DM
+    failures = []
+
+    async def notify_failures():
+        """Alert the owner and all admins about this cycle's failed channels"""
+        if not failures or not recipients:
+            return
+
+        warning_msg = _CHECK_ALERT_TMPL(
+            ts=cycle_ts,
+            count=len(failures),
+            failures="\n".join(failures[:15])
+            + (f"\n... and {len(failures) - 15} more" if len(failures) > 15 else ""),
+        )
+
+        # One concurrent fan-out instead of a serial per-admin loop
+        results = await asyncio.gather(
+            *(context.bot.send_message(chat_id=uid, text=warning_msg, parse_mode='Markdown')
+              for uid in recipients),
+            return_exceptions=True
+        )
+        for uid, result in zip(recipients, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to notify %s: %s", uid, result)
+
+    # Check channels concurrently; the semaphore caps in-flight sends so a
+    # large channel list doesn't burst past Telegram's rate limits
+    sem = asyncio.Semaphore(10)
+
+    # Status results are buffered here and written in one batch after the
+    # fan-out instead of one UPDATE round-trip per channel
+    pending_statuses = []
+
+    async def check_one(channel_id, channel_name):
         if is_shutting_down:
-            break
-            
+            return
+
         try:
-            # Send test message
-            message = await context.bot.send_message(
-                chat_id=channel_id,
-                text=test_message,
-                parse_mode=ParseMode.HTML
-            )
-            
-            await update_channel_status(channel_id, 'active')
-            logger.debug(f"Channel OK: {channel_name}")
-            
-            # Schedule message deletion
-            if delete_interval > 0:
-                await asyncio.sleep(delete_interval)
-                try:
-                    await context.bot.delete_message(
+            async with sem:
+                # Send test message (copied from the stored template when
+                # one exists, skipping per-channel parse-mode text)
+                if template is not None:
+                    message = await context.bot.copy_message(
                         chat_id=channel_id,
-                        message_id=message.message_id
+                        from_chat_id=template[0],
+                        message_id=template[1]
                     )
-                    logger.debug(f"Test message deleted from: {channel_name}")
-                except:
-                    pass  # Ignore deletion errors
-            
-            await asyncio.sleep(1)  # Delay between checks
-            
+                else:
+                    message = await context.bot.send_message(
+                        chat_id=channel_id,
+                        text=test_message,
+                        parse_mode=ParseMode.HTML
+                    )
+
+            pending_statuses.append((channel_id, 'active'))
+            logger.debug("Channel OK: %s", channel_name)
+
+            # Hand the deletion to the job queue so this task finishes
+            # with the send instead of sleeping out the delete timer
+            if delete_interval > 0:
+                context.job_queue.run_once(
+                    _delete_test_message,
+                    delete_interval,
+                    data=(channel_id, message.message_id),
+                    name=f'delete:{channel_id}'
+                )
+
+        except Exception as e:
+            logger.warning("Channel FAILED: %s - %s", channel_name, e)
+            pending_statuses.append((channel_id, 'inactive'))
+            failures.append(f"• {channel_name}: {str(e)[:60]}")
+
+    await asyncio.gather(
+        *(check_one(cid, name) for cid, name in channels.items())
+    )
+
+    await notify_failures()
+
+    if pending_statuses and db_pool and not is_shutting_down:
+        try:
+            async with db_pool.acquire() as conn:
+                await conn.executemany('''
+                    UPDATE channels
+                    SET status = $2, last_check = NOW()
+                    WHERE channel_id = $1
+                ''', pending_statuses)
         except Exception as e:
-            logger.warning(f"Channel FAILED: {channel_name} - {e}")
-            await update_channel_status(channel_id, 'inactive')
-            await asyncio.sleep(1)
+            logger.error(f"Error flushing channel statuses: {e}")
+
+async def resume_pending_broadcasts(application: Application):
+    """Restart any broadcasts that were interrupted by a shutdown"""
+    try:
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT broadcast_id, channel_id, from_chat_id, message_id
+                FROM broadcast_queue
+                ORDER BY created_at
+            ''')
+    except Exception as e:
+        logger.error(f"Error loading pending broadcasts: {e}")
+        return
+
+    if not rows:
+        return
+
+    channels = await get_all_channels()
+
+    pending = {}
+    for broadcast_id, channel_id, from_chat_id, message_id in rows:
+        job = pending.setdefault(broadcast_id, (from_chat_id, message_id, {}))
+        job[2][channel_id] = channels.get(channel_id, "Unknown")
+
+    logger.info("📡 Resuming %d interrupted broadcast(s)", len(pending))
+
+    for broadcast_id, (from_chat_id, message_id, remaining) in pending.items():
+        asyncio.create_task(_do_broadcast(
+            application.bot, from_chat_id, message_id, None, remaining,
+            broadcast_id=broadcast_id
+        ))
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle non-command messages"""
@@ -1490,28 +1816,76 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
 
 # ==================== WEB SERVER (FOR RENDER HEALTH CHECKS) ====================
 
-async def health_check(request):
-    """Health check endpoint for Render"""
-    return web.Response(text='OK', status=200)
+# The health endpoint only ever answers 200 OK, so a canned response on a
+# raw asyncio server replaces the whole aiohttp routing stack
+_HEALTH_RESPONSE = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/plain\r\n'
+    b'Content-Length: 2\r\n'
+    b'Connection: close\r\n'
+    b'\r\n'
+    b'OK'
+)
+
+async def _handle_health_request(reader, writer):
+    """Answer any HTTP request with a canned 200 OK"""
+    try:
+        await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5)
+    except Exception:
+        pass  # Malformed/short/slow request; respond anyway
+
+    try:
+        writer.write(_HEALTH_RESPONSE)
+        await writer.drain()
+        writer.close()
+    except Exception:
+        pass
+
+# Kept so shutdown can close the listener instead of leaking it past
+# Render's SIGTERM window
+_web_server = None
 
 async def start_web_server():
-    """Start a simple web server for health checks"""
+    """Start a minimal health-check listener for Render"""
+    global _web_server
     try:
-        app = web.Application()
-        app.router.add_get('/', health_check)
-        app.router.add_get('/health', health_check)
-        
         port = int(os.getenv('PORT', '8080'))
-        runner = web.AppRunner(app)
-        await runner.setup()
-        site = web.TCPSite(runner, '0.0.0.0', port)
-        await site.start()
+        _web_server = await asyncio.start_server(_handle_health_request, '0.0.0.0', port)
         logger.info(f"🌐 Web server started on port {port}")
     except Exception as e:
         logger.error(f"Failed to start web server: {e}")
 
 # ==================== MAIN FUNCTION ====================
 
+# Declarative command table; main() registers these in one loop so future
+# cross-cutting wrappers (metrics, rate limits) only need one call site
+COMMAND_HANDLERS = (
+    ("start", start),
+    ("help", help_command),
+    ("add_admin", add_admin_cmd),
+    ("remove_admin", remove_admin_cmd),
+    ("add_channel", add_channel_cmd),
+    ("remove_channel", remove_channel_cmd),
+    ("time_period", time_period_cmd),
+    ("test_message", test_message_cmd),
+    ("delete_interval", delete_interval_cmd),
+    ("list", list_channels_cmd),
+    ("status", status_cmd),
+    ("broadcast", broadcast_cmd),
+    ("on", bot_on_cmd),
+    ("off", bot_off_cmd),
+    ("usercount", usercount_cmd),
+    ("create_group", create_group_cmd),
+    ("add_to_group", add_to_group_cmd),
+    ("remove_from_group", remove_from_group_cmd),
+    ("list_groups", list_groups_cmd),
+    ("delete_group", delete_group_cmd),
+    ("promote", promote_cmd),
+    ("demote", demote_cmd),
+    ("updatename", update_channel_names_cmd),
+    ("publish", publish_cmd),
+)
+
 async def setup_bot_commands(application: Application):
     """Setup bot commands menu"""
     try:
@@ -1528,6 +1902,32 @@ async def setup_bot_commands(application: Application):
         ]
         
         await application.bot.set_my_commands(commands)
+
+        # Give the owner the full admin menu in their DM so their client
+        # renders the commands locally instead of everyone needing /help
+        owner = await get_owner()
+        if owner:
+            admin_commands = commands + [
+                BotCommand("add_admin", "Add a bot admin"),
+                BotCommand("remove_admin", "Remove a bot admin"),
+                BotCommand("add_channel", "Add a channel to monitor"),
+                BotCommand("remove_channel", "Remove a monitored channel"),
+                BotCommand("time_period", "Set check interval"),
+                BotCommand("test_message", "Set the check message"),
+                BotCommand("delete_interval", "Set test message delete delay"),
+                BotCommand("create_group", "Create a channel group"),
+                BotCommand("add_to_group", "Add a channel to a group"),
+                BotCommand("remove_from_group", "Remove a channel from a group"),
+                BotCommand("list_groups", "List channel groups"),
+                BotCommand("delete_group", "Delete a channel group"),
+                BotCommand("promote", "Promote a user in channels"),
+                BotCommand("demote", "Demote a user in channels"),
+                BotCommand("updatename", "Refresh channel names"),
+            ]
+            await application.bot.set_my_commands(
+                admin_commands, scope=BotCommandScopeChat(chat_id=owner)
+            )
+
         logger.info("✅ Bot commands menu setup completed")
     except Exception as e:
         logger.error(f"Failed to setup bot commands: {e}")
@@ -1535,35 +1935,52 @@ async def setup_bot_commands(application: Application):
 async def setup_periodic_check(application: Application):
     """Setup periodic channel status check"""
     try:
-        job_queue = application.job_queue
         check_interval = int(await get_config('check_interval') or 3600)
-        
-        # Remove existing jobs if any
-        jobs = job_queue.get_jobs_by_name('channel_check')
-        for job in jobs:
-            job.schedule_removal()
-        
-        # Add new job if interval > 0
+
+        # Replaces any existing job; starts after 1 minute
+        _reschedule_channel_check(application.job_queue, check_interval, first=60)
         if check_interval > 0:
-            job_queue.run_repeating(
-                check_channel_status,
-                interval=check_interval,
-                first=60,  # Start after 1 minute
-                name='channel_check'
-            )
             logger.info(f"⏰ Periodic check scheduled every {seconds_to_readable(check_interval)}")
     except Exception as e:
         logger.error(f"Failed to setup periodic check: {e}")
 
-async def shutdown():
-    """Graceful shutdown"""
+async def post_init(application: Application):
+    """Finish async setup once PTB's event loop is running"""
+    # Database must be up before the first update is handled
+    if not await init_db():
+        logger.error("❌ Failed to initialize database!")
+        logger.error("Please check your DATABASE_URL and PostgreSQL connection")
+        raise SystemExit(1)
+
+    # Start web server in background for health checks
+    asyncio.create_task(start_web_server())
+
+    await setup_bot_commands(application)
+    await setup_periodic_check(application)
+
+    # Pick up any broadcast interrupted by the last shutdown
+    await resume_pending_broadcasts(application)
+
+    bot_info = await application.bot.get_me()
+    logger.info(f"🤖 Bot @{bot_info.username} is now running!")
+    logger.info(f"👤 Bot ID: {bot_info.id}")
+    logger.info("✅ Bot is ready to receive commands")
+
+async def post_shutdown(application: Application):
+    """Graceful shutdown, driven by PTB's lifecycle (SIGTERM/SIGINT)"""
     global is_shutting_down
     is_shutting_down = True
     logger.info("🛑 Starting graceful shutdown...")
-    
-    # Wait a moment for ongoing operations
-    await asyncio.sleep(2)
-    
+
+    # Stop accepting health checks
+    if _web_server is not None:
+        try:
+            _web_server.close()
+            await _web_server.wait_closed()
+            logger.info("✅ Web server closed")
+        except Exception as e:
+            logger.error(f"Error closing web server: {e}")
+
     # Close database pool
     if db_pool:
         try:
@@ -1571,117 +1988,49 @@ async def shutdown():
             logger.info("✅ Database connection closed")
         except Exception as e:
             logger.error(f"Error closing database: {e}")
-    
+
     logger.info("👋 Bot shutdown complete")
-    sys.exit(0)
 
-async def main():
-    """Main async function - Entry point for Render"""
-    # Set up signal handlers for graceful shutdown
-    for sig in (signal.SIGTERM, signal.SIGINT):
-        signal.signal(sig, lambda s, f: asyncio.create_task(shutdown()))
-    
-    # Get environment variables
+def main():
+    """Entry point for Render"""
     token = os.getenv('TELEGRAM_BOT_TOKEN')
-    version = os.getenv('BOT_VERSION', '2.0.0')
-    
+
     if not token:
         logger.error("❌ TELEGRAM_BOT_TOKEN environment variable is not set!")
         logger.error("Please set it in Render environment variables")
         return
-    
-    logger.info(f"🚀 Starting Channel Monitor Bot v{version}...")
-    
-    # Initialize database
-    if not await init_db():
-        logger.error("❌ Failed to initialize database!")
-        logger.error("Please check your DATABASE_URL and PostgreSQL connection")
-        return
-    
-    # Create application
-    try:
-        application = Application.builder().token(token).build()
-        application.add_error_handler(error_handler)
-        logger.info("✅ Telegram application created")
-    except Exception as e:
-        logger.error(f"❌ Failed to create application: {e}")
-        return
-    
+
+    logger.info(f"🚀 Starting Channel Monitor Bot v{BOT_VERSION}...")
+
+    # Create application; run_polling owns the loop, signal handling and
+    # shutdown sequencing, so no hand-rolled initialize/start/park is needed
+    application = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(256)  # Don't serialize unrelated users' commands
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    application.add_error_handler(error_handler)
+
     # Add command handlers
     handlers = [
-        CommandHandler("start", start),
-        CommandHandler("help", help_command),
-        CommandHandler("add_admin", add_admin_cmd),
-        CommandHandler("remove_admin", remove_admin_cmd),
-        CommandHandler("add_channel", add_channel_cmd),
-        CommandHandler("remove_channel", remove_channel_cmd),
-        CommandHandler("time_period", time_period_cmd),
-        CommandHandler("test_message", test_message_cmd),
-        CommandHandler("delete_interval", delete_interval_cmd),
-        CommandHandler("list", list_channels_cmd),
-        CommandHandler("status", status_cmd),
-        CommandHandler("broadcast", broadcast_cmd),
-        CommandHandler("on", bot_on_cmd),
-        CommandHandler("off", bot_off_cmd),
-        CommandHandler("usercount", usercount_cmd),
-        CommandHandler("create_group", create_group_cmd),
-        CommandHandler("add_to_group", add_to_group_cmd),
-        CommandHandler("remove_from_group", remove_from_group_cmd),
-        CommandHandler("list_groups", list_groups_cmd),
-        CommandHandler("delete_group", delete_group_cmd),
-        CommandHandler("promote", promote_cmd),
-	    CommandHandler("demote", demote_cmd),
-	    CommandHandler("promote", promote_cmd),
+        *(CommandHandler(name, fn) for name, fn in COMMAND_HANDLERS),
         CallbackQueryHandler(promote_callback, pattern="^promote_"),
-        CommandHandler("updatename", update_channel_names_cmd),
-        CommandHandler("publish", publish_cmd),
         MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message),
     ]
-    
+
     for handler in handlers:
         application.add_handler(handler)
-    
+
     logger.info(f"✅ {len(handlers)} command handlers registered")
-    
-    # Start web server in background for health checks
-    asyncio.create_task(start_web_server())
-    
-    # Initialize the bot
-    try:
-        await application.initialize()
-        logger.info("✅ Bot initialized")
-        
-        # Setup bot commands
-        await setup_bot_commands(application)
-        
-        # Setup periodic checks
-        await setup_periodic_check(application)
-        
-        # Start the bot
-        await application.start()
-        await application.updater.start_polling(drop_pending_updates=True)
-        
-        bot_info = await application.bot.get_me()
-        logger.info(f"🤖 Bot @{bot_info.username} is now running!")
-        logger.info(f"👤 Bot ID: {bot_info.id}")
-        logger.info("✅ Bot is ready to receive commands")
-        
-        # Keep running until shutdown
-        logger.info("📡 Listening for updates...")
-        await asyncio.Event().wait()
-        
-    except KeyboardInterrupt:
-        logger.info("⚠️ Received keyboard interrupt")
-    except Exception as e:
-        logger.error(f"❌ Bot crashed: {e}")
-    finally:
-        # Clean shutdown
-        if not is_shutting_down:
-            await shutdown()
+
+    application.run_polling(drop_pending_updates=True)
 
 if __name__ == '__main__':
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         logger.info("👋 Bot stopped by user")
     except Exception as e: